@@ -21,13 +21,17 @@ def cli():
 @click.option('--database', '-d', type=click.Path(), default=DATABASE_PATH,
               help=f'Path to the SQLite baseline database (default: {DATABASE_PATH}).')
 @click.option('--force', '-f', is_flag=True, help='Overwrite existing baseline database if it exists.')
-def init_baseline(config, database, force):
+@click.option('--incremental', '-i', is_flag=True,
+              help='Refresh an existing baseline in place, re-hashing only files whose size or mtime changed.')
+def init_baseline(config, database, force, incremental):
     """
     Initializes the FIM baseline by scanning specified files and directories.
     """
     fim_logger.info(f"[*] Initializing FIM baseline using config: {config}")
 
-    if os.path.exists(database) and not force:
+    if incremental:
+        pass  # Keep the existing database and refresh it in place.
+    elif os.path.exists(database) and not force:
         click.confirm(f"Baseline database '{database}' already exists. Overwrite?", abort=True)
         os.remove(database)
         fim_logger.warning(f"[WARN] Existing database '{database}' removed.")
@@ -39,7 +43,7 @@ def init_baseline(config, database, force):
     monitor = FileIntegrityMonitor(fim_config_path=config, db_manager=db_manager)
 
     try:
-        monitor.create_baseline()
+        monitor.create_baseline(incremental=incremental)
         click.echo("[+] FIM baseline created successfully.")
     except Exception as e:
         fim_logger.critical(f"[CRITICAL] Failed to create baseline: {e}")
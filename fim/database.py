@@ -1,3 +1,4 @@
+import logging
 import sqlite3
 import os
 import time
@@ -5,13 +6,24 @@ import time
 from .config import DATABASE_PATH
 from .logger import fim_logger
 
+def glob_escape(text: str) -> str:
+    """
+    Escapes GLOB metacharacters so a path can be matched literally.
+    """
+    return text.replace('[', '[[]').replace('*', '[*]').replace('?', '[?]')
+
 class DatabaseManager:
     """
     Manages SQLite database operations for storing and retrieving file baseline data.
     """
+    # Statement texts are fixed so sqlite3's per-connection prepared
+    # statement cache is hit on every execution.
+    _SEL_ENTRY_SQL = "SELECT * FROM monitored_files WHERE file_path = ?"
+
     def __init__(self, db_path=DATABASE_PATH):
         self.db_path = db_path
         self.conn = None
+        self._cursor = None
         self._init_db()
 
     def __del__(self):
@@ -28,14 +40,58 @@ class DatabaseManager:
         """
         if self.conn is None:
             try:
-                self.conn = sqlite3.connect(self.db_path)
+                # check_same_thread=False: the connection is shared with
+                # worker threads (e.g. a background baseline writer); all
+                # access still goes through this one manager.
+                self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
                 self.conn.row_factory = sqlite3.Row
+                self._apply_pragmas(self.conn)
                 fim_logger.info(f"[*] FIM Database connection opened to {self.db_path}")
             except sqlite3.Error as e:
                 fim_logger.critical(f"[CRITICAL] FIM Database connection failed: {e}")
                 raise
         return self.conn
 
+    def _apply_pragmas(self, conn):
+        """
+        Applies the performance PRAGMAs to a fresh connection.
+        """
+        if self.db_path == ':memory:':
+            # In-memory databases (used by the tests) have no journal or
+            # fsync to tune.
+            return
+        # WAL halves the fsync count per commit and lets readers run
+        # alongside writers; the -wal/-shm files live beside the DB.
+        conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA mmap_size=268435456;
+            PRAGMA cache_size=-65536;
+            PRAGMA busy_timeout=5000;
+        """)
+
+    def reset_connection(self):
+        """
+        Closes the cached connection and cursor; the next query reopens them.
+        """
+        if self.conn:
+            self.conn.close()
+        self.conn = None
+        self._cursor = None
+
+    def _get_cursor(self):
+        """
+        Returns a cursor that is reused across calls.
+
+        A new cursor is only allocated when the underlying connection
+        changed, avoiding per-query cursor object churn.
+        """
+        conn = self._get_connection()
+        if self._cursor is None or self._cursor.connection is not conn:
+            self._cursor = conn.cursor()
+        return self._cursor
+
     def _init_db(self):
         """
         Initializes the database by creating the necessary table if it doesn't exist.
@@ -43,39 +99,89 @@ class DatabaseManager:
         try:
             conn = self._get_connection()
             cursor = conn.cursor()
+            # WITHOUT ROWID clusters rows on the file_path key itself, so
+            # point lookups and GLOB range scans hit one b-tree instead of
+            # an index probe plus a rowid fetch. Existing databases keep
+            # their original shape; IF NOT EXISTS leaves them untouched.
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS monitored_files (
                     file_path TEXT PRIMARY KEY,
-                    file_hash TEXT NOT NULL,
+                    file_hash BLOB NOT NULL,
                     file_size INTEGER NOT NULL,
                     modification_time REAL NOT NULL,
                     creation_time REAL NOT NULL,
                     permissions INTEGER NOT NULL,
                     baseline_timestamp REAL NOT NULL
-                )
+                ) WITHOUT ROWID
             """)
+            self._migrate_hex_hashes(cursor)
             conn.commit()
             fim_logger.info(f"[*] FIM Database initialized at {self.db_path}")
         except sqlite3.Error as e:
             fim_logger.critical(f"[CRITICAL] FIM Database initialization failed: {e}")
 
+    def _migrate_hex_hashes(self, cursor):
+        """
+        One-shot migration of hex text digests to raw blobs.
+
+        Baselines written before the BLOB schema stored 64-char hex
+        strings; converting them keeps old databases comparable against
+        the binary digests written now. Idempotent: only text-typed
+        values are touched.
+        """
+        cursor.execute("SELECT file_path, file_hash FROM monitored_files WHERE typeof(file_hash) = 'text'")
+        updates = []
+        for row in cursor.fetchall():
+            try:
+                updates.append((bytes.fromhex(row['file_hash']), row['file_path']))
+            except ValueError:
+                continue  # Not a hex digest; leave it as stored.
+        if updates:
+            cursor.executemany("UPDATE monitored_files SET file_hash = ? WHERE file_path = ?", updates)
+            fim_logger.info(f"[*] Migrated {len(updates)} baseline hashes from hex text to blobs.")
+
     def save_baseline_entry(self, file_path: str, file_hash: str, file_size: int, modification_time: float, creation_time: float, permissions: int):
         """
-        Saves or updates a file's baseline entry in the database.
+        Saves or updates a single file's baseline entry in the database.
+        """
+        self.save_baseline_entries([(file_path, file_hash, file_size, modification_time, creation_time, permissions)])
+
+    def save_baseline_entries(self, rows):
+        """
+        Saves or updates a batch of baseline entries in a single transaction.
+
+        Args:
+            rows: Iterable of (file_path, file_hash, file_size,
+                modification_time, creation_time, permissions) tuples.
+
+        Committing once per batch amortizes the per-commit fsync cost,
+        which dominates when inserting thousands of rows one at a time.
         """
         try:
             conn = self._get_connection()
-            cursor = conn.cursor()
             baseline_timestamp = time.time()
-            cursor.execute("""
-                INSERT OR REPLACE INTO monitored_files 
-                (file_path, file_hash, file_size, modification_time, creation_time, permissions, baseline_timestamp)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (file_path, file_hash, file_size, modification_time, creation_time, permissions, baseline_timestamp))
-            conn.commit()
-            fim_logger.debug(f"[DB] Saved baseline for {file_path}")
+            params = [row + (baseline_timestamp,) for row in rows]
+            # One transaction per batch; commits on success, rolls back on error.
+            with conn:
+                # UPSERT updates conflicting rows in place; OR REPLACE
+                # would delete and reinsert them, rewriting the whole row's
+                # b-tree entry on every refresh of an existing baseline.
+                conn.executemany("""
+                    INSERT INTO monitored_files
+                    (file_path, file_hash, file_size, modification_time, creation_time, permissions, baseline_timestamp)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(file_path) DO UPDATE SET
+                        file_hash=excluded.file_hash,
+                        file_size=excluded.file_size,
+                        modification_time=excluded.modification_time,
+                        creation_time=excluded.creation_time,
+                        permissions=excluded.permissions,
+                        baseline_timestamp=excluded.baseline_timestamp
+                """, params)
+            if fim_logger.isEnabledFor(logging.DEBUG):
+                fim_logger.debug(f"[DB] Saved {len(params)} baseline entries")
         except sqlite3.Error as e:
-            fim_logger.error(f"[DB_ERROR] Failed to save baseline for {file_path}: {e}")
+            fim_logger.error(f"[DB_ERROR] Failed to save baseline batch: {e}")
 
     def get_baseline_entry(self, file_path: str) -> dict | None:
         """
@@ -85,37 +191,89 @@ class DatabaseManager:
             dict or None: A dictionary containing file info, or None if not found.
         """
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM monitored_files WHERE file_path = ?", (file_path,))
+            cursor = self._get_cursor()
+            cursor.execute(self._SEL_ENTRY_SQL, (file_path,))
             row = cursor.fetchone()
             return dict(row) if row else None
         except sqlite3.Error as e:
             fim_logger.error(f"[DB_ERROR] Failed to retrieve baseline for {file_path}: {e}")
             raise
 
+    def get_all_entries(self) -> dict[str, dict]:
+        """
+        Returns every baseline entry in one query, keyed by file path.
+
+        Fetching the whole table up front avoids a per-file SELECT round
+        trip during integrity checks.
+        """
+        try:
+            cursor = self._get_cursor()
+            cursor.execute("SELECT * FROM monitored_files")
+            # Comprehending over the cursor itself skips the intermediate
+            # list fetchall() would build.
+            return {row['file_path']: dict(row) for row in cursor}
+        except sqlite3.Error as e:
+            fim_logger.error(f"[DB_ERROR] Failed to get all baseline entries: {e}")
+            raise
+
+    def iter_baseline_sorted(self):
+        """
+        Iterates baseline rows ordered by file path.
+
+        Streams straight off the primary-key index so callers can
+        merge-join against another sorted source without materializing
+        the whole table in memory.
+        """
+        try:
+            # A dedicated cursor: the caller consumes this lazily, and other
+            # queries must not clobber it mid-iteration.
+            cursor = self._get_connection().cursor()
+            cursor.execute("SELECT * FROM monitored_files ORDER BY file_path")
+            yield from cursor
+        except sqlite3.Error as e:
+            fim_logger.error(f"[DB_ERROR] Failed to iterate baseline entries: {e}")
+            raise
+
     def get_all_baseline_paths(self) -> set[str]:
         """
         Returns a set of all file paths currently in the baseline.
         """
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
+            cursor = self._get_cursor()
             cursor.execute("SELECT file_path FROM monitored_files")
-            return {row[0] for row in cursor.fetchall()}
+            return {row[0] for row in cursor}
         except sqlite3.Error as e:
             fim_logger.error(f"[DB_ERROR] Failed to get all baseline paths: {e}")
             raise
 
+    def get_paths_under(self, prefix: str) -> set[str]:
+        """
+        Returns the baseline paths that fall under a directory prefix.
+
+        The GLOB range scan rides the primary-key index, so checks scoped
+        to a subtree only touch that subtree's rows.
+        """
+        if not prefix.endswith(os.sep):
+            prefix += os.sep
+        try:
+            cursor = self._get_cursor()
+            cursor.execute("SELECT file_path FROM monitored_files WHERE file_path GLOB ?",
+                           (glob_escape(prefix) + '*',))
+            return {row[0] for row in cursor}
+        except sqlite3.Error as e:
+            fim_logger.error(f"[DB_ERROR] Failed to get baseline paths under {prefix}: {e}")
+            raise
+
     def remove_baseline_entry(self, file_path: str):
         """
         Removes a file's baseline entry from the database.
         """
         try:
             conn = self._get_connection()
-            cursor = conn.cursor()
+            cursor = self._get_cursor()
             cursor.execute("DELETE FROM monitored_files WHERE file_path = ?", (file_path,))
             conn.commit()
-            fim_logger.debug(f"[DB] Removed baseline for {file_path}")
+            if fim_logger.isEnabledFor(logging.DEBUG):
+                fim_logger.debug(f"[DB] Removed baseline for {file_path}")
         except sqlite3.Error as e:
             fim_logger.error(f"[DB_ERROR] Failed to remove baseline for {file_path}: {e}")
\ No newline at end of file
@@ -36,5 +36,34 @@ def setup_logging(log_level=LOG_LEVEL, console_output=VERBOSE_CONSOLE_OUTPUT):
 
     return fim_logger
 
-# Initialize logger when module is imported
-fim_logger = setup_logging()
\ No newline at end of file
+_configured = False
+
+def _ensure_configured():
+    """
+    Runs setup_logging exactly once, the first time it is needed.
+    """
+    global _configured
+    if not _configured:
+        _configured = True
+        setup_logging()
+
+class _ConfigureOnFirstRecord(logging.Filter):
+    """
+    Defers handler setup until a record is actually emitted, so importing
+    the package does not open the log file or create directories on CLI
+    invocations that never log.
+    """
+    def filter(self, record):
+        _ensure_configured()
+        return True
+
+# The logger object is created eagerly and stays cheap; file and console
+# handlers are only attached when the first record passes through.
+fim_logger = logging.getLogger('file_integrity_monitor')
+fim_logger.setLevel(LOG_LEVEL)
+fim_logger.propagate = False
+fim_logger.addFilter(_ConfigureOnFirstRecord())
+# A NullHandler keeps logging's "no handlers found" fallback quiet for
+# records emitted while real handlers are suppressed (e.g. under
+# logging.disable in the tests).
+fim_logger.addHandler(logging.NullHandler())
\ No newline at end of file
@@ -1,13 +1,91 @@
 import os
 import time
 import json
+import logging
+import queue
+import threading
 import yaml
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from typing import List, Dict, Any
 
 from .logger import fim_logger
-from .config import HASH_ALGORITHM, FIM_CONFIG_PATH
+from .config import HASH_ALGORITHM, FIM_CONFIG_PATH, TRUST_MTIME, PARALLEL_HASHING, cached_config_load
 from .hasher import calculate_file_hash
 from .database import DatabaseManager
+from . import hasher_mb
+
+# Number of paths handed to each worker per IPC round trip.
+HASH_POOL_CHUNKSIZE = 32
+
+# Number of baseline rows accumulated before flushing to the database.
+BASELINE_FLUSH_ROWS = 1000
+
+# Bound on rows queued between the hashing producer and the database
+# writer thread; puts block beyond this, capping peak memory.
+BASELINE_QUEUE_MAXSIZE = 10000
+
+# Sentinel key marking the end of a rule path inside a prefix trie. Path
+# components are never None, so it cannot collide.
+_RULE_END = None
+
+def _build_prefix_trie(abs_paths) -> dict:
+    """
+    Builds a component trie from absolute rule paths.
+
+    Each rule terminates in a _RULE_END marker, so '/a/b' matches
+    '/a/b/f' and '/a/b' itself but never '/a/bc'. Empty components are
+    skipped on insert and lookup alike: '/' splits into only empty
+    strings, so a root rule marks the trie root and matches everything.
+    """
+    trie = {}
+    for path in abs_paths:
+        node = trie
+        for part in path.split(os.sep):
+            if part:
+                node = node.setdefault(part, {})
+        node[_RULE_END] = True
+    return trie
+
+def _trie_matches(trie: dict, file_path: str) -> bool:
+    """
+    Returns True when some rule in the trie is a component-wise prefix of
+    file_path. Cost is O(path depth), independent of the rule count.
+    """
+    node = trie
+    for part in file_path.split(os.sep):
+        if not part:
+            continue
+        if _RULE_END in node:
+            return True
+        node = node.get(part)
+        if node is None:
+            return False
+    return _RULE_END in node
+
+def _hash_one(file_path: str, algorithm: str) -> tuple:
+    """
+    Hashes a single file and gathers its metadata.
+
+    Defined at module level so it is picklable and can run in
+    ProcessPoolExecutor workers. Returns (file_path, file_hash, metadata);
+    file_hash and metadata are None if the file could not be processed.
+    """
+    try:
+        # Raw digest bytes: half the size of hex and what the baseline stores.
+        file_hash = calculate_file_hash(file_path, algorithm, binary=True)
+        stat = os.stat(file_path)
+        metadata = {
+            'file_path': file_path,
+            'file_size': stat.st_size,
+            'modification_time': stat.st_mtime,
+            'creation_time': stat.st_ctime,
+            'permissions': stat.st_mode & 0o777
+        }
+        return (file_path, file_hash, metadata)
+    except Exception as e:
+        fim_logger.error(f"[ERROR] Failed to hash {file_path}: {e}")
+        return (file_path, None, None)
 
 class FileIntegrityMonitor:
     """
@@ -17,6 +95,10 @@ class FileIntegrityMonitor:
         self.fim_config_path = fim_config_path
         self.db_manager = db_manager if db_manager else DatabaseManager()
         self.monitored_paths = {'include': [], 'exclude': []}
+        self._abs_include = ()
+        self._abs_exclude = ()
+        self._include_trie = {}
+        self._exclude_trie = {}
         self._load_fim_config()
         fim_logger.info(f"[*] FIM initialized. Monitoring config from: {self.fim_config_path}")
 
@@ -28,10 +110,15 @@ class FileIntegrityMonitor:
             fim_logger.warning(f"[WARN] FIM config file not found at {self.fim_config_path}. Using empty config.")
             return
         try:
-            with open(self.fim_config_path, 'r') as f:
-                config = yaml.safe_load(f)
-                self.monitored_paths['include'] = config.get('include', [])
-                self.monitored_paths['exclude'] = config.get('exclude', [])
+            config = cached_config_load(self.fim_config_path) or {}
+            self.monitored_paths['include'] = config.get('include', [])
+            self.monitored_paths['exclude'] = config.get('exclude', [])
+            # Resolve rule paths once; _is_path_monitored runs for every
+            # walked file and must not recompute abspath per call.
+            self._abs_include = tuple(os.path.abspath(p) for p in self.monitored_paths['include'])
+            self._abs_exclude = tuple(os.path.abspath(p) for p in self.monitored_paths['exclude'])
+            self._include_trie = _build_prefix_trie(self._abs_include)
+            self._exclude_trie = _build_prefix_trie(self._abs_exclude)
             fim_logger.info(f"[*] Loaded FIM configuration: {len(self.monitored_paths['include'])} include paths, {len(self.monitored_paths['exclude'])} exclude paths.")
         except yaml.YAMLError as e:
             fim_logger.error(f"[ERROR] Error parsing FIM config file {self.fim_config_path}: {e}")
@@ -41,23 +128,48 @@ class FileIntegrityMonitor:
     def _is_path_monitored(self, file_path: str) -> bool:
         """
         Checks if a file path should be monitored based on include/exclude rules.
+
+        Rule paths are resolved to absolute form once in _load_fim_config,
+        and walked paths are already absolute (scandir inherits the root's
+        form), so no per-call abspath/normpath work happens here.
         """
-        # Check exclude rules first
-        for exclude_path in self.monitored_paths['exclude']:
-            if file_path.startswith(os.path.abspath(exclude_path)):
-                return False
-        # Check include rules
-        for include_path in self.monitored_paths['include']:
-            if file_path.startswith(os.path.abspath(include_path)):
-                return True
-        return False
+        # Exclude rules take precedence. Each trie walk costs O(path depth)
+        # no matter how many rules are configured.
+        if _trie_matches(self._exclude_trie, file_path):
+            return False
+        return _trie_matches(self._include_trie, file_path)
+
+    def _walk_entries(self, root: str):
+        """
+        Recursively yields os.DirEntry objects for files under root.
 
-    def _get_file_metadata(self, file_path: str) -> Dict[str, Any] | None:
+        Scanning with os.scandir lets the stat result cached on each entry
+        be reused for metadata instead of re-statting every file the way
+        os.walk + os.stat does, and the is_dir/is_file checks are answered
+        from the directory entry's d_type on Linux without any syscall.
+        Symlinked directories are not followed, matching os.walk's default.
         """
-        Retrieves metadata for a file.
+        try:
+            with os.scandir(root) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        yield from self._walk_entries(entry.path)
+                    elif entry.is_file():
+                        yield entry
+        except OSError as e:
+            fim_logger.error(f"[ERROR] Failed to scan directory {root}: {e}")
+
+    def _get_file_metadata(self, entry) -> Dict[str, Any] | None:
+        """
+        Retrieves metadata for a file, given an os.DirEntry or a path string.
         """
         try:
-            stat = os.stat(file_path)
+            if isinstance(entry, os.DirEntry):
+                file_path = entry.path
+                stat = entry.stat()
+            else:
+                file_path = entry
+                stat = os.stat(entry)
             return {
                 'file_path': file_path,
                 'file_size': stat.st_size,
@@ -71,39 +183,211 @@ class FileIntegrityMonitor:
             fim_logger.error(f"[ERROR] Failed to get metadata for {file_path}: {e}")
             return None
 
-    def create_baseline(self):
+    def create_baseline(self, incremental: bool = False):
         """
         Scans specified directories, computes hashes and metadata, and saves them to the database.
+
+        With incremental=True, files whose size and modification time
+        match an existing baseline row keep their stored hash and are not
+        re-read; rows for files that disappeared are removed. A re-init
+        over an unchanged tree then does almost no I/O.
         """
         fim_logger.info("[*] Creating new FIM baseline...")
         monitored_count = 0
+
+        # Phase 1: collect all candidate entries up front, keeping the
+        # DirEntry so its cached stat can serve the incremental filter.
+        candidate_entries = []
         for include_path in self.monitored_paths['include']:
             abs_include_path = os.path.abspath(include_path)
             if not os.path.exists(abs_include_path):
                 fim_logger.warning(f"[WARN] Include path '{abs_include_path}' does not exist. Skipping.")
                 continue
 
-            for root, _, files in os.walk(abs_include_path):
-                for file_name in files:
-                    file_path = os.path.join(root, file_name)
-                    if self._is_path_monitored(file_path):
-                        try:
-                            file_hash = calculate_file_hash(file_path, HASH_ALGORITHM)
-                            metadata = self._get_file_metadata(file_path)
-                            if metadata and file_hash:
-                                self.db_manager.save_baseline_entry(
-                                    file_path=file_path,
-                                    file_hash=file_hash,
-                                    file_size=metadata['file_size'],
-                                    modification_time=metadata['modification_time'],
-                                    creation_time=metadata['creation_time'],
-                                    permissions=metadata['permissions']
-                                )
-                                monitored_count += 1
-                        except Exception as e:
-                            fim_logger.error(f"[ERROR] Failed to process {file_path} for baseline: {e}")
+            for entry in self._walk_entries(abs_include_path):
+                if self._is_path_monitored(entry.path):
+                    candidate_entries.append(entry)
+
+        if incremental:
+            candidate_paths, reused_count = self._filter_unchanged(candidate_entries)
+            monitored_count += reused_count
+        else:
+            candidate_paths = [entry.path for entry in candidate_entries]
+
+        # Phase 2: hash files and persist results in batched transactions.
+        # The multi-buffer backend hashes batches in interleaved SIMD lanes
+        # when its native library is present; otherwise files fan out to a
+        # process pool.
+        if hasher_mb.HAVE_ISAL and HASH_ALGORITHM == 'sha256':
+            results = self._hash_candidates_mb(candidate_paths)
+        elif PARALLEL_HASHING:
+            results = self._hash_candidates_pool(candidate_paths)
+        else:
+            results = self._hash_candidates_serial(candidate_paths)
+
+        # A writer thread drains rows into batched transactions while the
+        # producer keeps hashing, so commit fsyncs hide behind hash work.
+        # The bounded queue applies backpressure if the writer falls behind.
+        row_queue = queue.Queue(maxsize=BASELINE_QUEUE_MAXSIZE)
+        writer = threading.Thread(target=self._write_baseline_rows, args=(row_queue,))
+        writer.start()
+        try:
+            for file_path, file_hash, metadata in results:
+                if metadata and file_hash:
+                    row_queue.put((
+                        file_path,
+                        file_hash,
+                        metadata['file_size'],
+                        metadata['modification_time'],
+                        metadata['creation_time'],
+                        metadata['permissions']
+                    ))
+                    monitored_count += 1
+        finally:
+            row_queue.put(None)  # Sentinel: no more rows.
+            writer.join()
         fim_logger.info(f"[+] Baseline created with {monitored_count} files.")
 
+    def _write_baseline_rows(self, row_queue):
+        """
+        Drains baseline rows from the queue into batched transactions.
+
+        Runs on the writer thread started by create_baseline; a None
+        sentinel signals the end of the stream. The shared connection is
+        opened with check_same_thread=False for exactly this use.
+        """
+        batch = []
+        while True:
+            row = row_queue.get()
+            if row is None:
+                break
+            batch.append(row)
+            if len(batch) >= BASELINE_FLUSH_ROWS:
+                self.db_manager.save_baseline_entries(batch)
+                batch = []
+        if batch:
+            self.db_manager.save_baseline_entries(batch)
+
+    def _filter_unchanged(self, candidate_entries) -> tuple:
+        """
+        Splits candidates against the existing baseline for an incremental run.
+
+        Returns (paths_to_hash, reused_count): files whose (size, mtime,
+        permissions) match their baseline row — the same triple the check
+        path compares — keep the stored hash and are dropped from the
+        hash list. A permissions-only change still reuses the stored hash
+        but rewrites the row's metadata, so the refreshed baseline always
+        matches a subsequent check. Baseline rows with no live file are
+        removed.
+        """
+        prior_rows = self.db_manager.get_all_entries()
+        candidate_paths = []
+        refresh_rows = []
+        live_paths = set()
+        reused_count = 0
+        for entry in candidate_entries:
+            live_paths.add(entry.path)
+            prior = prior_rows.get(entry.path)
+            if prior is not None:
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                if stat.st_size == prior['file_size'] and stat.st_mtime == prior['modification_time']:
+                    if stat.st_mode & 0o777 != prior['permissions']:
+                        # Content unchanged, only metadata drifted: keep
+                        # the stored hash, rewrite the row.
+                        refresh_rows.append((
+                            entry.path,
+                            prior['file_hash'],
+                            stat.st_size,
+                            stat.st_mtime,
+                            stat.st_ctime,
+                            stat.st_mode & 0o777
+                        ))
+                    reused_count += 1
+                    continue
+            candidate_paths.append(entry.path)
+        if refresh_rows:
+            self.db_manager.save_baseline_entries(refresh_rows)
+        for stale_path in set(prior_rows) - live_paths:
+            self.db_manager.remove_baseline_entry(stale_path)
+        fim_logger.info(f"[*] Incremental baseline: reusing {reused_count} unchanged entries, hashing {len(candidate_paths)}.")
+        return candidate_paths, reused_count
+
+    def _hash_candidates_pool(self, candidate_paths: List[str]):
+        """
+        Yields (path, hash, metadata) for each candidate, hashing across a
+        process pool.
+        """
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            yield from executor.map(
+                _hash_one, candidate_paths, repeat(HASH_ALGORITHM),
+                chunksize=HASH_POOL_CHUNKSIZE)
+
+    def _hash_candidates_serial(self, candidate_paths: List[str]):
+        """
+        Yields (path, hash, metadata) for each candidate, hashing in-process.
+        """
+        for file_path in candidate_paths:
+            yield _hash_one(file_path, HASH_ALGORITHM)
+
+    def _hash_candidates_mb(self, candidate_paths: List[str]):
+        """
+        Yields (path, hash, metadata) for each candidate, hashing batches
+        of files through the multi-buffer backend.
+        """
+        for start in range(0, len(candidate_paths), hasher_mb.MB_BATCH_SIZE):
+            batch = candidate_paths[start:start + hasher_mb.MB_BATCH_SIZE]
+            hashes = hasher_mb.hash_batch(batch, HASH_ALGORITHM)
+            for file_path in batch:
+                file_hash = hashes.get(file_path)
+                if file_hash is not None:
+                    file_hash = bytes.fromhex(file_hash)
+                metadata = self._get_file_metadata(file_path) if file_hash else None
+                yield (file_path, file_hash, metadata)
+
+    def _classify_change(self, entry, baseline_entry, changes: Dict[str, Any], hash_candidates: List[tuple]):
+        """
+        Compares a live file against its baseline row, recording metadata
+        mismatches in changes or queueing the file for hash verification.
+
+        The common unchanged case is decided with a single tuple
+        comparison; the per-field classification only runs on a mismatch.
+        """
+        if isinstance(entry, os.DirEntry):
+            file_path = entry.path
+        else:
+            file_path = entry
+        try:
+            stat = entry.stat() if isinstance(entry, os.DirEntry) else os.stat(entry)
+        except OSError:
+            return  # Skip if metadata can't be retrieved
+        live = (stat.st_size, stat.st_mtime, stat.st_mode & 0o777)
+
+        try:
+            if live == (baseline_entry['file_size'], baseline_entry['modification_time'], baseline_entry['permissions']):
+                if TRUST_MTIME:
+                    # Size, mtime and permissions all match; the user opted
+                    # to trust that over a full content hash.
+                    if fim_logger.isEnabledFor(logging.DEBUG):
+                        fim_logger.debug(f"[*] Skipping hash verification for {file_path} (trust_mtime enabled)")
+                else:
+                    # Only calculate hash if metadata is unchanged; hashing is
+                    # deferred so all candidates can be processed in parallel.
+                    hash_candidates.append((file_path, baseline_entry['file_hash']))
+            elif live[0] != baseline_entry['file_size']:
+                changes['modified'].append({'file': file_path, 'type': 'size_mismatch', 'old_size': baseline_entry['file_size'], 'new_size': live[0]})
+                fim_logger.warning(f"[MODIFIED] Size mismatch for {file_path}")
+            elif live[1] != baseline_entry['modification_time']:
+                changes['modified'].append({'file': file_path, 'type': 'mtime_mismatch', 'old_mtime': baseline_entry['modification_time'], 'new_mtime': live[1]})
+                fim_logger.warning(f"[MODIFIED] Modification time mismatch for {file_path}")
+            else:
+                changes['modified'].append({'file': file_path, 'type': 'permissions_mismatch', 'old_perms': oct(baseline_entry['permissions']), 'new_perms': oct(live[2])})
+                fim_logger.warning(f"[MODIFIED] Permissions mismatch for {file_path}")
+        except Exception as e:
+            fim_logger.error(f"[ERROR] Error checking {file_path} for modifications: {e}")
+
     def check_integrity(self) -> Dict[str, Any]:
         """
         Compares current file states to the baseline and reports changes.
@@ -113,65 +397,62 @@ class FileIntegrityMonitor:
         """
         fim_logger.info("[*] Checking file integrity against baseline...")
         changes = {'added': [], 'modified': [], 'deleted': []}
-        
-        baseline_paths = self.db_manager.get_all_baseline_paths()
-        current_paths = set()
 
-        # First, build a set of all currently monitored paths
+        current_entries = {}
+
+        # First, collect all currently monitored files, keeping the DirEntry
+        # so its cached stat can serve the metadata comparison below.
         for include_path in self.monitored_paths['include']:
             abs_include_path = os.path.abspath(include_path)
             if not os.path.exists(abs_include_path):
                 continue
-            for root, _, files in os.walk(abs_include_path):
-                for file_name in files:
-                    file_path = os.path.join(root, file_name)
-                    if self._is_path_monitored(file_path):
-                        current_paths.add(file_path)
-
-        # Identify added and deleted files
-        added_files = current_paths - baseline_paths
-        deleted_files = baseline_paths - current_paths
-
-        for file_path in added_files:
-            changes['added'].append({'file': file_path, 'reason': 'New file not in baseline'})
-            fim_logger.info(f"[ADDED] New file detected: {file_path}")
+            for entry in self._walk_entries(abs_include_path):
+                if self._is_path_monitored(entry.path):
+                    current_entries[entry.path] = entry
 
-        for file_path in deleted_files:
-            changes['deleted'].append({'file': file_path, 'reason': 'File deleted from monitored path'})
-            fim_logger.warning(f"[DELETED] File deleted: {file_path}")
-
-        # Check for modifications in files that are in both baseline and current paths
-        for file_path in baseline_paths.intersection(current_paths):
-            current_metadata = self._get_file_metadata(file_path)
-            if not current_metadata:
-                continue  # Skip if metadata can't be retrieved
-
-            baseline_entry = self.db_manager.get_baseline_entry(file_path)
-            if not baseline_entry:
-                # This case is unlikely but handled for safety
-                changes['added'].append({'file': file_path, 'reason': 'File exists but is not in baseline'})
-                fim_logger.info(f"[ADDED] New file detected (edge case): {file_path}")
-                continue
+        # Merge-join the sorted live listing against the baseline cursor.
+        # The baseline streams straight off the primary-key index, so only
+        # the live path list is held in memory, never the full table.
+        sorted_current = sorted(current_entries)
+        hash_candidates = []  # (path, baseline_hash) pairs needing content verification
+        # The loop body runs once per baseline row; bind the attribute
+        # chains it uses to locals so the interpreter resolves them once
+        # instead of per iteration.
+        record_added = changes['added'].append
+        record_deleted = changes['deleted'].append
+        classify = self._classify_change
+        i, n = 0, len(sorted_current)
+        for baseline_entry in self.db_manager.iter_baseline_sorted():
+            baseline_path = baseline_entry['file_path']
+            while i < n and sorted_current[i] < baseline_path:
+                file_path = sorted_current[i]
+                record_added({'file': file_path, 'reason': 'New file not in baseline'})
+                fim_logger.info(f"[ADDED] New file detected: {file_path}")
+                i += 1
+            if i < n and sorted_current[i] == baseline_path:
+                classify(current_entries[baseline_path], baseline_entry, changes, hash_candidates)
+                i += 1
+            else:
+                record_deleted({'file': baseline_path, 'reason': 'File deleted from monitored path'})
+                fim_logger.warning(f"[DELETED] File deleted: {baseline_path}")
+        while i < n:
+            file_path = sorted_current[i]
+            record_added({'file': file_path, 'reason': 'New file not in baseline'})
+            fim_logger.info(f"[ADDED] New file detected: {file_path}")
+            i += 1
 
-            # Check for metadata and hash changes
-            try:
-                if current_metadata['file_size'] != baseline_entry['file_size']:
-                    changes['modified'].append({'file': file_path, 'type': 'size_mismatch', 'old_size': baseline_entry['file_size'], 'new_size': current_metadata['file_size']})
-                    fim_logger.warning(f"[MODIFIED] Size mismatch for {file_path}")
-                elif current_metadata['modification_time'] != baseline_entry['modification_time']:
-                    changes['modified'].append({'file': file_path, 'type': 'mtime_mismatch', 'old_mtime': baseline_entry['modification_time'], 'new_mtime': current_metadata['modification_time']})
-                    fim_logger.warning(f"[MODIFIED] Modification time mismatch for {file_path}")
-                elif current_metadata['permissions'] != baseline_entry['permissions']:
-                    changes['modified'].append({'file': file_path, 'type': 'permissions_mismatch', 'old_perms': oct(baseline_entry['permissions']), 'new_perms': oct(current_metadata['permissions'])})
-                    fim_logger.warning(f"[MODIFIED] Permissions mismatch for {file_path}")
-                else:
-                    # Only calculate hash if metadata is unchanged
-                    current_hash = calculate_file_hash(file_path, HASH_ALGORITHM)
-                    if current_hash != baseline_entry['file_hash']:
-                        changes['modified'].append({'file': file_path, 'type': 'hash_mismatch', 'old_hash': baseline_entry['file_hash'], 'new_hash': current_hash})
-                        fim_logger.warning(f"[MODIFIED] Hash mismatch for {file_path}")
-            except Exception as e:
-                fim_logger.error(f"[ERROR] Error checking {file_path} for modifications: {e}")
+        if hash_candidates:
+            baseline_hashes = dict(hash_candidates)
+            if PARALLEL_HASHING:
+                results = self._hash_candidates_pool(list(baseline_hashes))
+            else:
+                results = self._hash_candidates_serial(list(baseline_hashes))
+            for file_path, current_hash, _ in results:
+                if current_hash is None:
+                    continue
+                if current_hash != baseline_hashes[file_path]:
+                    changes['modified'].append({'file': file_path, 'type': 'hash_mismatch', 'old_hash': baseline_hashes[file_path], 'new_hash': current_hash})
+                    fim_logger.warning(f"[MODIFIED] Hash mismatch for {file_path}")
 
         fim_logger.info("[+] Integrity check complete.")
         return changes
\ No newline at end of file
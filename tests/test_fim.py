@@ -1,7 +1,9 @@
 import unittest
 from unittest.mock import patch, MagicMock
+import logging
 import os
 import shutil
+import tempfile
 import time
 import hashlib
 import yaml
@@ -12,6 +14,15 @@ from fim.hasher import calculate_file_hash
 from fim.database import DatabaseManager
 from fim.monitor import FileIntegrityMonitor
 
+def setUpModule():
+    # Silence FIM logging for the whole module instead of mock-patching
+    # fim_logger in every setUp; the lazy handler setup in fim.logger
+    # means no log file is ever opened either.
+    logging.disable(logging.CRITICAL)
+
+def tearDownModule():
+    logging.disable(logging.NOTSET)
+
 class TestHasher(unittest.TestCase):
 
     def setUp(self):
@@ -20,9 +31,6 @@ class TestHasher(unittest.TestCase):
         self.test_file = os.path.join(self.test_dir, "test_hash_file.txt")
         with open(self.test_file, 'w') as f:
             f.write("This is content for hashing.")
-        # Mock logger
-        patch('fim.hasher.fim_logger').start()
-        self.addCleanup(patch.stopall)
 
     def tearDown(self):
         if os.path.exists(self.test_dir):
@@ -49,9 +57,6 @@ class TestDatabaseManager(unittest.TestCase):
     def setUp(self):
         self.test_db_path = ":memory:" # Use in-memory database for testing
         self.db_manager = DatabaseManager(db_path=self.test_db_path)
-        # Mock logger
-        patch('fim.database.fim_logger').start()
-        self.addCleanup(patch.stopall)
 
     def test_init_db(self):
         conn = self.db_manager._get_connection()
@@ -81,6 +86,26 @@ class TestDatabaseManager(unittest.TestCase):
         paths = self.db_manager.get_all_baseline_paths()
         self.assertEqual(paths, {"/test/file1.txt", "/test/file2.txt"})
 
+    def test_get_all_entries(self):
+        self.db_manager.save_baseline_entry("/test/file1.txt", "h1", 1, 1, 1, 1)
+        self.db_manager.save_baseline_entry("/test/file2.txt", "h2", 2, 2, 2, 2)
+        entries = self.db_manager.get_all_entries()
+        self.assertEqual(set(entries), {"/test/file1.txt", "/test/file2.txt"})
+        self.assertEqual(entries["/test/file2.txt"]['file_hash'], "h2")
+
+    def test_get_paths_under(self):
+        self.db_manager.save_baseline_entry("/a/b/file1.txt", "h1", 1, 1, 1, 1)
+        self.db_manager.save_baseline_entry("/a/b/sub/file2.txt", "h2", 2, 2, 2, 2)
+        self.db_manager.save_baseline_entry("/a/bb/file3.txt", "h3", 3, 3, 3, 3)
+        self.assertEqual(self.db_manager.get_paths_under("/a/b"),
+                         {"/a/b/file1.txt", "/a/b/sub/file2.txt"})
+
+    def test_get_paths_under_glob_metacharacters(self):
+        self.db_manager.save_baseline_entry("/a/[x]*?/file1.txt", "h1", 1, 1, 1, 1)
+        self.db_manager.save_baseline_entry("/a/y/file2.txt", "h2", 2, 2, 2, 2)
+        self.assertEqual(self.db_manager.get_paths_under("/a/[x]*?"),
+                         {"/a/[x]*?/file1.txt"})
+
     def test_get_baseline_entry_error(self):
         with patch.object(self.db_manager, '_get_connection') as mock_conn:
             mock_conn.return_value.cursor.return_value.execute.side_effect = sqlite3.Error
@@ -102,7 +127,10 @@ class TestDatabaseManager(unittest.TestCase):
 class TestFileIntegrityMonitor(unittest.TestCase):
 
     def setUp(self):
-        self.test_dir = os.path.abspath("test_fim_monitor_dir")
+        # Fixture files live on tmpfs when available so the suite never
+        # waits on disk writes.
+        self.test_dir = tempfile.mkdtemp(
+            dir='/dev/shm' if os.path.isdir('/dev/shm') else None)
         self.monitored_path = os.path.join(self.test_dir, "monitored")
         self.excluded_path = os.path.join(self.monitored_path, "excluded")
         os.makedirs(self.monitored_path, exist_ok=True)
@@ -120,10 +148,6 @@ class TestFileIntegrityMonitor(unittest.TestCase):
         self.db_manager = DatabaseManager(db_path=self.test_db_path)
         self.monitor = FileIntegrityMonitor(fim_config_path=self.fim_config_path, db_manager=self.db_manager)
 
-        # Mock logger
-        patch('fim.monitor.fim_logger').start()
-        self.addCleanup(patch.stopall)
-
     def tearDown(self):
         if os.path.exists(self.test_dir):
             shutil.rmtree(self.test_dir)
@@ -144,6 +168,16 @@ class TestFileIntegrityMonitor(unittest.TestCase):
         self.assertFalse(self.monitor._is_path_monitored(os.path.abspath(excluded_file)))
         self.assertFalse(self.monitor._is_path_monitored("/tmp/unmonitored.txt"))
 
+    def test_is_path_monitored_root_rule(self):
+        root_config_path = os.path.join(self.test_dir, "root_config.yaml")
+        with open(root_config_path, 'w') as f:
+            yaml.dump({'include': ['/'], 'exclude': [self.excluded_path]}, f)
+        monitor = FileIntegrityMonitor(fim_config_path=root_config_path, db_manager=self.db_manager)
+
+        self.assertTrue(monitor._is_path_monitored('/etc/passwd'))
+        self.assertTrue(monitor._is_path_monitored(os.path.join(self.monitored_path, "file.txt")))
+        self.assertFalse(monitor._is_path_monitored(os.path.join(self.excluded_path, "excluded.txt")))
+
     def test_create_baseline(self):
         file1 = self._create_test_file("file1.txt")
         file2 = self._create_test_file("subdir/file2.txt")
@@ -157,6 +191,29 @@ class TestFileIntegrityMonitor(unittest.TestCase):
         self.assertIsNone(self.db_manager.get_baseline_entry(os.path.abspath(excluded_file)))
         self.assertEqual(len(self.db_manager.get_all_baseline_paths()), 2)
 
+    def test_create_baseline_incremental(self):
+        file1 = self._create_test_file("file1.txt")
+        file2 = self._create_test_file("file2.txt")
+        file3 = self._create_test_file("file3.txt")
+        self.monitor.create_baseline()
+
+        os.chmod(file1, 0o600)  # metadata-only change
+        with open(file2, 'a') as f:
+            f.write("changed content")
+        os.remove(file3)
+        file4 = self._create_test_file("file4.txt")
+
+        self.monitor.create_baseline(incremental=True)
+
+        self.assertEqual(self.db_manager.get_baseline_entry(file1)['permissions'], 0o600)
+        self.assertIsNone(self.db_manager.get_baseline_entry(file3))
+        self.assertIsNotNone(self.db_manager.get_baseline_entry(file4))
+        # The refreshed baseline must match a subsequent check exactly.
+        changes = self.monitor.check_integrity()
+        self.assertEqual(len(changes['added']), 0)
+        self.assertEqual(len(changes['modified']), 0)
+        self.assertEqual(len(changes['deleted']), 0)
+
     def test_check_integrity_no_changes(self):
         file1 = self._create_test_file("file1.txt")
         self.monitor.create_baseline()
@@ -186,6 +243,22 @@ class TestFileIntegrityMonitor(unittest.TestCase):
         self.assertEqual(len(changes['added']), 1)
         self.assertEqual(changes['added'][0]['file'], file2)
 
+    def test_check_integrity_combined_changes(self):
+        file1 = self._create_test_file("a_file.txt")
+        file2 = self._create_test_file("m_file.txt")
+        file3 = self._create_test_file("z_file.txt")
+        self.monitor.create_baseline()
+
+        os.remove(file1)
+        with open(file2, 'a') as f:
+            f.write("more content")
+        file4 = self._create_test_file("new_file.txt")
+
+        changes = self.monitor.check_integrity()
+        self.assertEqual([c['file'] for c in changes['added']], [file4])
+        self.assertEqual([c['file'] for c in changes['deleted']], [file1])
+        self.assertEqual([c['file'] for c in changes['modified']], [file2])
+
     def test_check_integrity_deleted_file(self):
         file1 = self._create_test_file("file1.txt")
         self.monitor.create_baseline()
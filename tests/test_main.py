@@ -4,12 +4,15 @@ from click.testing import CliRunner
 from fim.cli import cli
 import os
 import shutil
+import tempfile
 
 class TestMainCli(unittest.TestCase):
     def setUp(self):
         self.runner = CliRunner()
-        self.test_dir = "test_cli_dir"
-        os.makedirs(self.test_dir, exist_ok=True)
+        # Fixture files live on tmpfs when available so the suite never
+        # waits on disk writes.
+        self.test_dir = tempfile.mkdtemp(
+            dir='/dev/shm' if os.path.isdir('/dev/shm') else None)
         self.config_path = os.path.join(self.test_dir, "config.yaml")
         self.db_path = os.path.join(self.test_dir, "fim.db")
         self.monitored_dir = os.path.join(self.test_dir, "monitored")